@@ -1,18 +1,36 @@
 from __future__ import annotations
 
-import json
+import atexit
 import time
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
+from types import TracebackType
 from typing import Any
 
+from workflow.jsonfmt import dumps_line
+
+# Timestamp formateado del segundo en curso y [inicio, fin) de ese segundo.
+_ts_text = ""
+_ts_start = 0.0
+_ts_end = 0.0
+_time = time.time
+
 
 def utc_now_iso() -> str:
-    return datetime.now(UTC).isoformat(timespec="seconds")
+    # Precisión de segundos: se formatea una vez por segundo y se reutiliza
+    # para todos los eventos de ese segundo (mismo valor que datetime.now).
+    # El camino frecuente es una lectura de reloj y dos comparaciones de float.
+    global _ts_text, _ts_start, _ts_end
+    now = _time()
+    if not _ts_start <= now < _ts_end:
+        sec = int(now)
+        _ts_start, _ts_end = float(sec), sec + 1.0
+        _ts_text = datetime.fromtimestamp(sec, UTC).isoformat(timespec="seconds")
+    return _ts_text
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AuditEvent:
     ts_utc: str
     level: str
@@ -28,14 +46,49 @@ class AuditEvent:
 
 
 class AuditLogger:
+    """
+    Escritor JSONL del decision log.
+
+    Mantiene el archivo abierto durante la corrida con un buffer amplio
+    (sin open/close por evento). `flush()` vuelca lo pendiente al disco
+    (al cerrar cada etapa y antes de hashear el log); `close()` o el context
+    manager cierran. Si el proceso termina sin cerrar, atexit vuelca el buffer.
+    """
+
+    BUFFER_SIZE = 1 << 20
+
     def __init__(self, out_path: Path) -> None:
         self.out_path = out_path
         self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = self.out_path.open("ab", buffering=self.BUFFER_SIZE)
+        # El buffer del BufferedWriter ya agrupa las escrituras: emit entrega cada
+        # línea directo (acumular y unir en Python resultó más lento).
+        self._write = self._f.write
+        atexit.register(self.close)
+
+    def emit(self, ev: AuditEvent | dict[str, Any]) -> None:
+        # En el loop por registro se emite un dict plano con las mismas claves
+        # (y orden) que AuditEvent: evita construir el dataclass por evento. Es
+        # dict y no cualquier Mapping: orjson y el fallback solo serializan dicts.
+        self._write(dumps_line(ev))
+
+    def flush(self) -> None:
+        self._f.flush()
+
+    def close(self) -> None:
+        atexit.unregister(self.close)
+        self._f.close()
+
+    def __enter__(self) -> AuditLogger:
+        return self
 
-    def emit(self, ev: AuditEvent) -> None:
-        line = json.dumps(asdict(ev), ensure_ascii=False)
-        with self.out_path.open("a", encoding="utf-8") as f:
-            f.write(line + "\n")
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
 
 
 class StageTimer:
@@ -1,12 +1,78 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
 
-from workflow.models import Decision, NormalizedRequest, RuleFailure, ValidationResult
-from workflow.rules import Rule
+from workflow.models import (
+    Decision,
+    NormalizedRequest,
+    RawRequest,
+    RuleFailure,
+    ValidationResult,
+)
+from workflow.normalize import NormalizationError, iter_normalize
+from workflow.rules import (
+    AmountRangeRule,
+    CurrencyAllowedRule,
+    RequiredFieldsRule,
+    Rule,
+)
 
+DEFAULT_RULE_CACHE_SIZE = 4096
 
-def validate(r: NormalizedRequest, rules: Sequence[Rule]) -> ValidationResult:
+# Resultado por registro de `iter_process`: el error de normalización o el
+# registro normalizado junto con su validación.
+Processed = NormalizationError | tuple[NormalizedRequest, ValidationResult]
+
+
+class RuleCache:
+    """
+    Memo LRU acotado de resultados de reglas entre registros de una corrida.
+
+    Clave: (regla, rule.cache_key(r)): la instancia (frozen, se compara por
+    parámetros, no solo por rule_id) y solo los campos que la regla lee (ver
+    rules.CacheableRule). Reglas sin `cache_key` no se cachean: preferimos un
+    miss a un reuso incorrecto. Una instancia por corrida (mismo set de reglas).
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_RULE_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[tuple[Rule, Hashable], str | None] = OrderedDict()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return 0.0 if lookups == 0 else self.hits / lookups
+
+    def check(self, rule: Rule, r: NormalizedRequest) -> str | None:
+        # getattr y no isinstance(CacheableRule): el chequeo de Protocol es caro.
+        cache_key: Callable[[NormalizedRequest], Hashable] | None = getattr(rule, "cache_key", None)
+        if cache_key is None:
+            return rule.check(r)
+
+        # La regla (no su rule_id) en la clave: dos reglas con el mismo id y
+        # distintos parámetros no comparten resultados.
+        key = (rule, cache_key(r))
+        data = self._data
+        if key in data:
+            self.hits += 1
+            data.move_to_end(key)
+            return data[key]
+
+        self.misses += 1
+        reason = data[key] = rule.check(r)
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
+        return reason
+
+
+def validate(
+    r: NormalizedRequest,
+    rules: Sequence[Rule],
+    cache: RuleCache | None = None,
+) -> ValidationResult:
     """
     Ejecuta las reglas de elegibilidad sobre un registro normalizado.
 
@@ -18,7 +84,7 @@ def validate(r: NormalizedRequest, rules: Sequence[Rule]) -> ValidationResult:
     failures: list[RuleFailure] = []
 
     for rule in rules:
-        reason = rule.check(r)
+        reason = rule.check(r) if cache is None else cache.check(rule, r)
         if reason is not None:
             failures.append(
                 RuleFailure(
@@ -38,3 +104,115 @@ def validate(r: NormalizedRequest, rules: Sequence[Rule]) -> ValidationResult:
         decision=Decision.ACCEPT,
         failures=tuple(),
     )
+
+
+def compile_validator(
+    rules: Sequence[Rule],
+    cache: RuleCache | None = None,
+) -> Callable[[NormalizedRequest], ValidationResult]:
+    """
+    Devuelve un validador por registro especializado para `rules`.
+
+    Si el set contiene solo reglas conocidas (a lo sumo una de cada tipo), sus
+    condiciones se evalúan en línea, con los parámetros capturados como
+    locales: el camino feliz no despacha `check` por regla. En un rechazo solo
+    se consulta `check` (vía `cache` si se pasa) a las reglas cuyo predicado
+    falló, en el orden de `rules`: mismos motivos y orden que `validate`. Con
+    reglas desconocidas se usa `validate` tal cual.
+    """
+    rules = tuple(rules)
+    known = (RequiredFieldsRule, CurrencyAllowedRule, AmountRangeRule)
+    kinds = [type(rule) for rule in rules]
+    if any(k not in known for k in kinds) or len(set(kinds)) != len(kinds):
+        return lambda r: validate(r, rules, cache)
+
+    required = RequiredFieldsRule in kinds
+    currency = next((rule for rule in rules if isinstance(rule, CurrencyAllowedRule)), None)
+    amount = next((rule for rule in rules if isinstance(rule, AmountRangeRule)), None)
+    allowed = currency.allowed if currency is not None else None
+    lo, hi = (amount.min_value, amount.max_value) if amount is not None else (0.0, 0.0)
+    check_amount = amount is not None
+    accepted = ValidationResult(decision=Decision.ACCEPT, failures=tuple())
+    # Posición de cada regla en la tupla de predicados (required, currency, amount).
+    slots = tuple((known.index(kind), rule) for kind, rule in zip(kinds, rules, strict=True))
+    check = (lambda rule, r: rule.check(r)) if cache is None else cache.check
+
+    def reject(r: NormalizedRequest, ok: tuple[bool, bool, bool]) -> ValidationResult:
+        failures: list[RuleFailure] = []
+        for slot, rule in slots:
+            if ok[slot]:
+                continue
+            reason = check(rule, r)
+            if reason is None:
+                # El predicado en línea es conservador (p. ej. monto NaN).
+                continue
+            failures.append(
+                RuleFailure(
+                    rule_id=rule.rule_id,
+                    severity=rule.severity,
+                    reason=reason,
+                )
+            )
+        if not failures:
+            return accepted
+        return ValidationResult(decision=Decision.REJECT, failures=tuple(failures))
+
+    def fused(r: NormalizedRequest) -> ValidationResult:
+        moneda = r.moneda
+        required_ok = not required or bool(
+            r.id_solicitud and r.id_cliente and r.tipo_producto and moneda and r.pais
+        )
+        currency_ok = allowed is None or moneda in allowed
+        amount_ok = not check_amount or lo <= r.monto_o_limite <= hi
+        if required_ok and currency_ok and amount_ok:
+            return accepted
+        return reject(r, (required_ok, currency_ok, amount_ok))
+
+    return fused
+
+
+def _iter_processed(
+    raws: Iterable[RawRequest],
+    validator: Callable[[NormalizedRequest], ValidationResult],
+) -> Iterator[Processed]:
+    for n in iter_normalize(raws):
+        yield n if isinstance(n, NormalizationError) else (n, validator(n))
+
+
+def _iter_deduped(
+    raws: Iterable[RawRequest],
+    validator: Callable[[NormalizedRequest], ValidationResult],
+) -> Iterator[Processed]:
+    # Los registros nuevos pasan por un único _iter_processed (así se conserva el
+    # cache de fechas de iter_normalize), alimentado de a uno: iter_normalize
+    # consume exactamente un RawRequest por cada resultado que produce.
+    pending: list[RawRequest] = []
+    results = _iter_processed(iter(pending.pop, None), validator)
+    seen: dict[RawRequest, Processed] = {}
+    for raw in raws:
+        item = seen.get(raw)
+        if item is None:
+            pending.append(raw)
+            item = seen[raw] = next(results)
+        yield item
+
+
+def iter_process(
+    raws: Iterable[RawRequest],
+    rules: Sequence[Rule],
+    cache: RuleCache | None = None,
+    *,
+    dedup: bool = False,
+) -> Iterator[Processed]:
+    """
+    Normaliza y valida registro a registro, en el proceso actual (streaming).
+
+    Cada registro se produce apenas está clasificado, en el orden de `raws`.
+    Con `dedup`, cada RawRequest distinto (igualdad campo a campo) se procesa
+    una sola vez y los duplicados reciben el mismo resultado (inmutable); el
+    memo crece con la cantidad de registros distintos.
+    """
+    validator = compile_validator(rules, cache)
+    if dedup:
+        return _iter_deduped(raws, validator)
+    return _iter_processed(raws, validator)
@@ -1,14 +1,28 @@
 from __future__ import annotations
 
 import csv
+import io
 import json
-from collections.abc import Iterable, Mapping
+from collections.abc import (
+    Callable,
+    Collection,
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from collections.abc import Set as AbstractSet
 from dataclasses import dataclass
+from operator import itemgetter
 from pathlib import Path
+from types import TracebackType
+from typing import Any, Protocol, TextIO
 
 from workflow.models import RawRequest
 
-# Columnas mínimas requeridas por el challenge (y por el contrato de entrada del motor)
+# Columnas mínimas requeridas por el challenge (y por el contrato de entrada del motor).
+# Mismo orden que los campos de RawRequest: los readers arman filas posicionalmente.
 REQUIRED_COLUMNS: tuple[str, ...] = (
     "id_solicitud",
     "fecha_solicitud",
@@ -20,13 +34,50 @@ REQUIRED_COLUMNS: tuple[str, ...] = (
     "is_vip",
     "risk_score",
 )
+REQUIRED_COLUMNS_SET: frozenset[str] = frozenset(REQUIRED_COLUMNS)
 
 
 class InputFormatError(ValueError):
     """Error de formato de entrada: no cumple el contrato mínimo esperado."""
 
 
-@dataclass(frozen=True)
+class HashSink(Protocol):
+    """Hasher incremental (p.ej. hashlib.sha256()) que recibe los bytes leídos."""
+
+    def update(self, data: bytes | memoryview, /) -> None: ...
+
+
+class _HashingReader(io.RawIOBase):
+    # Pasa al sink cada bloque que lee: el archivo se hashea en la misma lectura
+    # que lo parsea (una sola pasada de disco).
+    def __init__(self, raw: io.FileIO, sink: HashSink) -> None:
+        self._raw = raw
+        self._sink = sink
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        n = self._raw.readinto(buffer)
+        if n:
+            self._sink.update(memoryview(buffer)[:n])
+        return n
+
+    def close(self) -> None:
+        self._raw.close()
+        super().close()
+
+
+def _open_text(
+    path: Path, *, newline: str | None = None, hash_sink: HashSink | None = None
+) -> TextIO:
+    if hash_sink is None:
+        return path.open("r", encoding="utf-8-sig", newline=newline)
+    raw = _HashingReader(path.open("rb", buffering=0), hash_sink)
+    return io.TextIOWrapper(io.BufferedReader(raw), encoding="utf-8-sig", newline=newline)
+
+
+@dataclass(frozen=True, slots=True)
 class FixedWidthField:
     """Definición de campo fixed-width (estilo COBOL/mainframe)."""
 
@@ -51,30 +102,18 @@ DEFAULT_COBOL_LAYOUT: tuple[FixedWidthField, ...] = (
 
 def _build_raw_request(row: Mapping[str, object | None]) -> RawRequest:
     """Convierte un mapping (fila) en RawRequest, normalizando None -> ''."""
+    # Posicional: REQUIRED_COLUMNS tiene el mismo orden que los campos de RawRequest.
+    return RawRequest(*["" if v is None else str(v) for v in map(row.get, REQUIRED_COLUMNS)])
 
-    def g(k: str) -> str:
-        v = row.get(k)
-        return "" if v is None else str(v)
-
-    return RawRequest(
-        id_solicitud=g("id_solicitud"),
-        fecha_solicitud=g("fecha_solicitud"),
-        tipo_producto=g("tipo_producto"),
-        id_cliente=g("id_cliente"),
-        monto_o_limite=g("monto_o_limite"),
-        moneda=g("moneda"),
-        pais=g("pais"),
-        is_vip=g("is_vip"),
-        risk_score=g("risk_score"),
-    )
 
-
-def _assert_required_columns(cols: Iterable[str]) -> None:
+def _assert_required_columns(cols: Collection[str]) -> None:
     """Garantiza contrato mínimo. Si falta algo, fallamos rápido con mensaje claro."""
-    colset = set(cols)
+    # dict.keys() ya es un Set: en JSON (un chequeo por registro) no se arma set nuevo.
+    colset = cols if isinstance(cols, AbstractSet) else frozenset(cols)
+    if REQUIRED_COLUMNS_SET <= colset:
+        return
     missing = [c for c in REQUIRED_COLUMNS if c not in colset]
-    if missing:
-        raise InputFormatError(f"Input missing required columns: {missing}")
+    raise InputFormatError(f"Input missing required columns: {missing}")
 
 
 def _assert_file_exists(path: Path) -> None:
@@ -82,22 +121,75 @@ def _assert_file_exists(path: Path) -> None:
         raise InputFormatError(f"Input file not found: {path}")
 
 
-def read_csv(path: Path) -> list[RawRequest]:
-    _assert_file_exists(path)
+def _iter_lines(path: Path, hash_sink: HashSink | None = None) -> Generator[str, None, None]:
+    """
+    Mismas líneas que `read_text(...).splitlines()`, leyendo en streaming:
+    no materializa el texto decodificado completo ni la lista de líneas.
+    """
+    with _open_text(path, hash_sink=hash_sink) as f:
+        for physical in f:
+            yield from physical.splitlines()
+
 
-    with path.open("r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        if reader.fieldnames is None:
-            raise InputFormatError("CSV has no header row")
-        _assert_required_columns(reader.fieldnames)
-        return [_build_raw_request(dict(row)) for row in reader]
+def _read_delimited_rows(
+    path: Path,
+    delimiter: str,
+    label: str,
+    hash_sink: HashSink | None = None,
+) -> Iterator[RawRequest]:
+    """
+    Lee texto delimitado con header vía csv.reader, en streaming.
+
+    El contrato se valida una sola vez contra el header (al llamar, no al
+    iterar); los índices de columna se resuelven ahí y cada fila se arma
+    posicionalmente (mismo orden que REQUIRED_COLUMNS / RawRequest).
+    """
+    f = _open_text(path, newline="", hash_sink=hash_sink)
+    try:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            raise InputFormatError(f"{label} has no header row")
+        _assert_required_columns(header)
+    except BaseException:
+        f.close()
+        raise
+
+    # Con columnas repetidas gana la última, como en csv.DictReader.
+    index = {c: i for i, c in enumerate(header)}
+    pick = itemgetter(*(index[c] for c in REQUIRED_COLUMNS))
+    return _iter_delimited(f, reader, pick, len(header))
+
+
+def _iter_delimited(
+    f: TextIO,
+    reader: Iterator[list[str]],
+    pick: Callable[[list[str]], Any],
+    width: int,
+) -> Iterator[RawRequest]:
+    with f:
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                # Igual que DictReader: campos faltantes al final -> ''
+                row += [""] * (width - len(row))
+            yield RawRequest(*pick(row))
+
+
+def read_csv(path: Path, hash_sink: HashSink | None = None) -> Iterator[RawRequest]:
+    _assert_file_exists(path)
+    return _read_delimited_rows(path, ",", "CSV", hash_sink)
 
 
-def read_json(path: Path) -> list[RawRequest]:
+def read_json(path: Path, hash_sink: HashSink | None = None) -> Iterator[RawRequest]:
     _assert_file_exists(path)
 
+    data = path.read_bytes()
+    if hash_sink is not None:
+        hash_sink.update(data)
     try:
-        payload = json.loads(path.read_text(encoding="utf-8-sig"))
+        payload = json.loads(data.decode("utf-8-sig"))
     except json.JSONDecodeError as exc:
         raise InputFormatError(f"Invalid JSON file: {path}") from exc
 
@@ -113,13 +205,13 @@ def read_json(path: Path) -> list[RawRequest]:
     if not isinstance(records, list):
         raise InputFormatError("JSON root must be a list or object with 'requests' list")
 
-    rows: list[RawRequest] = []
+    # El documento ya está en memoria: validamos todo el contrato de entrada
+    # y los RawRequest se construyen recién al iterar.
     for i, item in enumerate(records):
         if not isinstance(item, dict):
             raise InputFormatError(f"JSON record at index {i} is not an object")
         _assert_required_columns(item.keys())
-        rows.append(_build_raw_request(item))
-    return rows
+    return map(_build_raw_request, records)
 
 
 def _detect_delimiter(header_line: str) -> str | None:
@@ -130,101 +222,160 @@ def _detect_delimiter(header_line: str) -> str | None:
     return None
 
 
-def read_txt_delimited(path: Path) -> list[RawRequest]:
+def read_txt_delimited(path: Path, hash_sink: HashSink | None = None) -> Iterator[RawRequest]:
     """Lee TXT delimitado con header. Si no detecta delimitador, pide cobol/fixed-width."""
     _assert_file_exists(path)
 
-    lines = path.read_text(encoding="utf-8-sig").splitlines()
-    non_empty = [ln for ln in lines if ln.strip()]
-    if not non_empty:
+    # Solo hace falta la primera línea no vacía para detectar el delimitador.
+    lines = _iter_lines(path)
+    header_line = next((ln for ln in lines if ln.strip()), None)
+    lines.close()
+    if header_line is None:
         raise InputFormatError("TXT input is empty")
 
-    delim = _detect_delimiter(non_empty[0])
+    delim = _detect_delimiter(header_line)
     if delim is None:
         raise InputFormatError(
             "TXT format not recognized as delimited text; use --format cobol for fixed-width files"
         )
 
-    with path.open("r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f, delimiter=delim)
-        if reader.fieldnames is None:
-            raise InputFormatError("TXT has no header row")
-        _assert_required_columns(reader.fieldnames)
-        return [_build_raw_request(dict(row)) for row in reader]
+    return _read_delimited_rows(path, delim, "TXT", hash_sink)
 
 
 def read_cobol_fixed_width(
     path: Path,
     layout: tuple[FixedWidthField, ...] = DEFAULT_COBOL_LAYOUT,
-) -> list[RawRequest]:
-    """Lee fixed-width (estilo COBOL). Layout versionable; default incluido como ejemplo."""
+    hash_sink: HashSink | None = None,
+) -> Iterator[RawRequest]:
+    """
+    Lee fixed-width (estilo COBOL). Layout versionable; default incluido como ejemplo.
+
+    Igual que en los formatos con header, el layout (y que haya datos) se valida
+    al llamar, contra la primera línea no vacía; las filas se leen al iterar.
+    """
     _assert_file_exists(path)
 
-    rows: list[RawRequest] = []
-    for line_no, line in enumerate(path.read_text(encoding="utf-8-sig").splitlines(), start=1):
-        if not line.strip():
-            continue
-        row = {f.name: line[f.start : f.end].strip() for f in layout}
+    lines = _iter_lines(path)
+    first = next((n for n, ln in enumerate(lines, start=1) if ln.strip()), None)
+    lines.close()
+    if first is None:
+        raise InputFormatError("Fixed-width input has no data rows")
 
-        try:
-            _assert_required_columns(row.keys())
-        except InputFormatError as exc:
-            raise InputFormatError(f"Fixed-width layout mismatch at line {line_no}: {exc}") from exc
+    by_name = {f.name: f for f in layout}
+    try:
+        _assert_required_columns(by_name)
+    except InputFormatError as exc:
+        raise InputFormatError(f"Fixed-width layout mismatch at line {first}: {exc}") from exc
 
-        rows.append(_build_raw_request(row))
+    # El layout es fijo para todo el archivo: se precompila a un único itemgetter
+    # de slices (orden RawRequest) que corta cada línea en C.
+    # Posiciones por carácter (str), no por byte: seguro con texto no-ASCII.
+    cut = itemgetter(*(slice(by_name[c].start, by_name[c].end) for c in REQUIRED_COLUMNS))
+    return _iter_fixed_width(path, cut, hash_sink)
 
-    if not rows:
-        raise InputFormatError("Fixed-width input has no data rows")
-    return rows
+
+def _iter_fixed_width(
+    path: Path,
+    cut: Callable[[str], Any],
+    hash_sink: HashSink | None,
+) -> Iterator[RawRequest]:
+    for line in _iter_lines(path, hash_sink):
+        if line.strip():
+            yield RawRequest(*map(str.strip, cut(line)))
+
+
+UNKNOWN_FORMAT = "unknown"
+_FORMAT_BY_SUFFIX: dict[str, str] = {
+    ".csv": "csv",
+    ".json": "json",
+    ".txt": "txt",
+    ".dat": "cobol",
+    ".cob": "cobol",
+}
+_FORMAT_ALIASES: dict[str, str] = {"fixed": "cobol", "fixed-width": "cobol"}
+
+
+def resolve_input_format(path: Path, input_format: str = "auto") -> str:
+    """
+    Formato efectivo de ingesta: csv | json | txt | cobol.
+
+    `auto` se resuelve por extensión (UNKNOWN_FORMAT si no es soportada); los
+    alias de fixed-width se normalizan a `cobol`; otro valor explícito se
+    devuelve tal cual (read_requests lo rechaza).
+    """
+    fmt = input_format.lower().strip()
+    if fmt == "auto":
+        return _FORMAT_BY_SUFFIX.get(path.suffix.lower(), UNKNOWN_FORMAT)
+    return _FORMAT_ALIASES.get(fmt, fmt)
 
 
-def read_requests(path: Path, input_format: str = "auto") -> list[RawRequest]:
+def read_requests(
+    path: Path,
+    input_format: str = "auto",
+    hash_sink: HashSink | None = None,
+) -> Iterator[RawRequest]:
     """
     Fachada única de ingesta (un solo entrypoint para el workflow).
     input_format:
       - auto (por extensión)
       - csv | json | txt | cobol
-    """
-    fmt = input_format.lower().strip()
 
-    if fmt == "auto":
-        suffix = path.suffix.lower()
-        if suffix == ".csv":
-            fmt = "csv"
-        elif suffix == ".json":
-            fmt = "json"
-        elif suffix == ".txt":
-            fmt = "txt"
-        elif suffix in {".dat", ".cob"}:
-            fmt = "cobol"
-        else:
-            raise InputFormatError(
-                f"Unsupported input extension '{suffix}'. Use --format csv|json|txt|cobol"
-            )
+    Devuelve un iterador (streaming): quien necesite una lista usa `list(...)`.
+    El contrato (header / layout) se valida al llamar: InputFormatError no
+    surge durante la iteración.
+
+    Con `hash_sink`, los bytes del archivo se pasan al hasher mientras se leen;
+    el hash cubre el archivo completo una vez consumido el iterador.
+    """
+    fmt = resolve_input_format(path, input_format)
+    if fmt == UNKNOWN_FORMAT and input_format.lower().strip() == "auto":
+        raise InputFormatError(
+            f"Unsupported input extension '{path.suffix.lower()}'. Use --format csv|json|txt|cobol"
+        )
 
     if fmt == "csv":
-        return read_csv(path)
+        return read_csv(path, hash_sink)
     if fmt == "json":
-        return read_json(path)
+        return read_json(path, hash_sink)
     if fmt == "txt":
-        return read_txt_delimited(path)
-    if fmt in {"cobol", "fixed", "fixed-width"}:
-        return read_cobol_fixed_width(path)
+        return read_txt_delimited(path, hash_sink)
+    if fmt == "cobol":
+        return read_cobol_fixed_width(path, hash_sink=hash_sink)
 
     raise InputFormatError(f"Unsupported format '{input_format}'. Use csv|json|txt|cobol")
 
 
-def write_clean_csv(path: Path, rows: Iterable[dict[str, object]]) -> None:
-    """Escritura estable a CSV con header; si no hay filas, archivo vacío."""
-    rows_list = list(rows)
-    path.parent.mkdir(parents=True, exist_ok=True)
+class CsvRowWriter:
+    """
+    CSV escrito fila a fila mientras el pipeline clasifica registros (streaming).
 
-    if not rows_list:
-        path.write_text("", encoding="utf-8")
-        return
+    El header se escribe al abrir; si al cerrar no hubo filas, el archivo queda
+    vacío. `writerow` es el del csv.writer: sin capa extra por fila.
+    """
 
-    fieldnames = list(rows_list[0].keys())
-    with path.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows_list)
+    def __init__(self, path: Path, header: Sequence[str]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = path.open("w", encoding="utf-8", newline="")
+        writer = csv.writer(self._f)
+        writer.writerow(header)
+        self._header_end = self._f.tell()
+        self.writerow: Callable[[Iterable[object]], object] = writer.writerow
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        if self._f.tell() == self._header_end:
+            self._f.seek(0)
+            self._f.truncate()
+        self._f.close()
+
+    def __enter__(self) -> CsvRowWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import json
+from dataclasses import fields, is_dataclass
+from typing import Any
+
+# orjson es opcional (extra "fast"): C + SIMD, serializa directo a bytes UTF-8.
+# Sin orjson usamos stdlib con separadores equivalentes: ambas rutas producen
+# los mismos bytes para los payloads del workflow.
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+_FIELD_NAMES: dict[type[Any], tuple[str, ...]] = {}
+
+
+def _default(o: Any) -> Any:
+    # Conversión superficial (no `asdict`, que copia en profundidad): json vuelve
+    # a llamar a `default` para cada valor anidado que lo necesite.
+    if is_dataclass(o) and not isinstance(o, type):
+        cls = type(o)
+        names = _FIELD_NAMES.get(cls)
+        if names is None:
+            names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(o))
+        return {n: getattr(o, n) for n in names}
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def stdlib_dumps_line(obj: Any) -> bytes:
+    text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default)
+    return (text + "\n").encode("utf-8")
+
+
+def stdlib_dumps_pretty(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=_default).encode("utf-8")
+
+
+def dumps_line(obj: Any) -> bytes:
+    """Una línea JSONL compacta (con '\\n' final). Acepta dicts y dataclasses."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return stdlib_dumps_line(obj)
+
+
+def dumps_pretty(obj: Any) -> bytes:
+    """JSON indentado (2 espacios) para reportes y manifest."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return stdlib_dumps_pretty(obj)
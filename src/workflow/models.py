@@ -16,7 +16,7 @@ class Decision(StrEnum):
     REJECT = "REJECT"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RawRequest:
     id_solicitud: str
     fecha_solicitud: str
@@ -29,7 +29,7 @@ class RawRequest:
     risk_score: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class NormalizedRequest:
     id_solicitud: str
     fecha_solicitud: date
@@ -43,27 +43,27 @@ class NormalizedRequest:
     risk_bucket: str  # LOW/MED/HIGH (campo calculado)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RuleFailure:
     rule_id: str
     severity: Severity
     reason: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ValidationResult:
     decision: Decision
     failures: tuple[RuleFailure, ...]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class WorkflowStats:
     total: int
     valid: int
     invalid: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class QualityRuleDetail:
     rule_id: str
     failed_count: int
@@ -71,7 +71,7 @@ class QualityRuleDetail:
     examples: list[str]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class QualityReport:
     run_id: str
     generated_utc: str
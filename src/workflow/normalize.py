@@ -1,16 +1,40 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator, Sequence
 from datetime import date, datetime
+from functools import lru_cache
 
 from workflow.models import NormalizedRequest, RawRequest
 
 
 class NormalizationError(ValueError):
-    pass
+    # id_solicitud (sin espacios) del registro que no se pudo normalizar: lo
+    # completan normalize / iter_normalize, así el rechazo se reporta sin
+    # conservar el RawRequest.
+    record_id: str = ""
+
+
+# Campos tipo "enum" (moneda, pais, tipo_producto) tienen pocos valores distintos:
+# el resultado normalizado se memoiza y se comparte entre registros.
+@lru_cache(maxsize=1024)
+def _norm_upper(s: str) -> str:
+    return s.strip().upper()
+
+
+@lru_cache(maxsize=1024)
+def _norm_lower(s: str) -> str:
+    return s.strip().lower()
 
 
 def _parse_date(s: str) -> date:
     s2 = s.strip()
+    # Ruta rápida (C, formato fijo) para la forma canónica YYYY-MM-DD.
+    # Lo que no pase por acá cae a strptime, que define qué se acepta.
+    if len(s2) == 10 and s2[4] == "-" and s2[7] == "-":
+        try:
+            return date.fromisoformat(s2)
+        except ValueError:
+            pass
     # Aceptamos solo ISO YYYY-MM-DD (para mantener claridad y auditabilidad)
     try:
         return datetime.strptime(s2, "%Y-%m-%d").date()
@@ -21,32 +45,48 @@ def _parse_date(s: str) -> date:
 
 
 def _parse_amount(s: str) -> float:
-    s2 = s.strip()
-    if s2 == "":
-        raise NormalizationError("monto_o_limite is empty")
+    # float()/int() ya ignoran espacios alrededor: el strip solo hace falta
+    # para distinguir "vacío" de "no numérico" en el mensaje de error.
     try:
-        return float(s2)
-    except Exception as exc:
-        raise NormalizationError(f"monto_o_limite is not numeric: '{s}'") from exc
+        return float(s)
+    except ValueError:
+        pass
+    if s.strip() == "":
+        raise NormalizationError("monto_o_limite is empty")
+    raise NormalizationError(f"monto_o_limite is not numeric: '{s}'")
+
+
+_BOOL_MAP: dict[str, bool] = {
+    "true": True,
+    "1": True,
+    "yes": True,
+    "y": True,
+    "false": False,
+    "0": False,
+    "no": False,
+    "n": False,
+}
 
 
 def _parse_bool(s: str) -> bool:
-    s2 = s.strip().lower()
-    if s2 in {"true", "1", "yes", "y"}:
-        return True
-    if s2 in {"false", "0", "no", "n"}:
-        return False
-    raise NormalizationError(f"is_vip is not a boolean: '{s}'")
+    # Ruta rápida: el valor ya viene en forma canónica ("true", "0", ...).
+    v = _BOOL_MAP.get(s)
+    if v is not None:
+        return v
+    try:
+        return _BOOL_MAP[s.strip().lower()]
+    except KeyError as exc:
+        raise NormalizationError(f"is_vip is not a boolean: '{s}'") from exc
 
 
 def _parse_int(s: str) -> int:
-    s2 = s.strip()
-    if s2 == "":
-        raise NormalizationError("risk_score is empty")
     try:
-        return int(s2)
-    except Exception as exc:
-        raise NormalizationError(f"risk_score is not an int: '{s}'") from exc
+        return int(s)
+    except ValueError:
+        pass
+    if s.strip() == "":
+        raise NormalizationError("risk_score is empty")
+    raise NormalizationError(f"risk_score is not an int: '{s}'")
 
 
 def _risk_bucket(score: int) -> str:
@@ -57,21 +97,68 @@ def _risk_bucket(score: int) -> str:
     return "HIGH"
 
 
-def normalize(raw: RawRequest) -> NormalizedRequest:
+# Tabla precalculada para el dominio habitual del score (0-99): el bucket sale
+# de un índice, sin llamada ni ramas por registro. Fuera de rango, _risk_bucket.
+_RISK_BUCKET_BY_SCORE: tuple[str, ...] = tuple(_risk_bucket(s) for s in range(100))
+
+
+def _normalize(raw: RawRequest, fecha: date) -> NormalizedRequest:
     # trimming + casing
-    tipo = raw.tipo_producto.strip().lower()
-    moneda = raw.moneda.strip().upper()
-    pais = raw.pais.strip().upper()
+    tipo = _norm_lower(raw.tipo_producto)
+    moneda = _norm_upper(raw.moneda)
+    pais = _norm_upper(raw.pais)
+    amount = _parse_amount(raw.monto_o_limite)
+    is_vip = _parse_bool(raw.is_vip)
+    score = _parse_int(raw.risk_score)
 
     return NormalizedRequest(
         id_solicitud=raw.id_solicitud.strip(),
-        fecha_solicitud=_parse_date(raw.fecha_solicitud),
+        fecha_solicitud=fecha,
         tipo_producto=tipo,
         id_cliente=raw.id_cliente.strip(),
-        monto_o_limite=_parse_amount(raw.monto_o_limite),
+        monto_o_limite=amount,
         moneda=moneda,
         pais=pais,
-        is_vip=_parse_bool(raw.is_vip),
-        risk_score=_parse_int(raw.risk_score),
-        risk_bucket=_risk_bucket(_parse_int(raw.risk_score)),
+        is_vip=is_vip,
+        risk_score=score,
+        risk_bucket=(
+            _RISK_BUCKET_BY_SCORE[score]
+            if 0 <= score < len(_RISK_BUCKET_BY_SCORE)
+            else _risk_bucket(score)
+        ),
     )
+
+
+def normalize(raw: RawRequest) -> NormalizedRequest:
+    try:
+        fecha = _parse_date(raw.fecha_solicitud)
+        return _normalize(raw, fecha)
+    except NormalizationError as exc:
+        exc.record_id = raw.id_solicitud.strip()
+        raise
+
+
+def iter_normalize(raws: Iterable[RawRequest]) -> Iterator[NormalizedRequest | NormalizationError]:
+    """
+    Normaliza registro a registro (streaming), preservando el orden de entrada.
+
+    - Cada fecha distinta se parsea una sola vez
+      (en un lote de back-office las fechas se repiten mucho).
+    - Los errores no cortan el flujo: en la posición del registro inválido
+      se produce la NormalizationError correspondiente (con su record_id).
+    """
+    dates: dict[str, date] = {}
+    for raw in raws:
+        try:
+            fecha = dates.get(raw.fecha_solicitud)
+            if fecha is None:
+                fecha = dates[raw.fecha_solicitud] = _parse_date(raw.fecha_solicitud)
+            yield _normalize(raw, fecha)
+        except NormalizationError as exc:
+            exc.record_id = raw.id_solicitud.strip()
+            yield exc
+
+
+def normalize_batch(raws: Sequence[RawRequest]) -> list[NormalizedRequest | NormalizationError]:
+    """Lote completo normalizado (ver `iter_normalize`)."""
+    return list(iter_normalize(raws))
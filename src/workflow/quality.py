@@ -1,18 +1,16 @@
 from __future__ import annotations
 
-import json
 from collections import defaultdict
+from collections.abc import Mapping
 from dataclasses import dataclass
-from datetime import UTC, datetime
+from operator import itemgetter
 from pathlib import Path
 
+from workflow.audit import utc_now_iso
+from workflow.jsonfmt import dumps_pretty
 from workflow.models import QualityReport, QualityRuleDetail, WorkflowStats
 
 
-def utc_now_iso() -> str:
-    return datetime.now(UTC).isoformat(timespec="seconds")
-
-
 def _safe_rate(numer: int, denom: int) -> float:
     return 0.0 if denom <= 0 else numer / denom
 
@@ -96,12 +94,35 @@ def evaluate_quality_gate(
     )
 
 
+MAX_RULE_EXAMPLES = 3
+
+
+class BoundedExamples:
+    """
+    Acumulador de fallas por regla con memoria acotada.
+
+    Cuenta todas las fallas pero sólo retiene los primeros
+    MAX_RULE_EXAMPLES ids (los únicos que llegan al reporte).
+    """
+
+    __slots__ = ("count", "examples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.examples: list[str] = []
+
+    def append(self, record_id: str) -> None:
+        self.count += 1
+        if len(self.examples) < MAX_RULE_EXAMPLES:
+            self.examples.append(record_id)
+
+
 def build_quality_report(
     run_id: str,
     total: int,
     valid: int,
     invalid: int,
-    failures_by_rule: dict[str, list[str]],
+    failures_by_rule: Mapping[str, BoundedExamples],
 ) -> QualityReport:
     """
     Construye un reporte de calidad 'audit-friendly':
@@ -113,18 +134,16 @@ def build_quality_report(
     determinísticamente en write_quality_report para mantener inmutabilidad
     del modelo QualityReport (frozen dataclass).
     """
-    rule_details: list[QualityRuleDetail] = []
-    for rule_id, examples in sorted(failures_by_rule.items()):
-        failed_count = len(examples)
-        pass_rate = 0.0 if total == 0 else (total - failed_count) / total
-        rule_details.append(
-            QualityRuleDetail(
-                rule_id=rule_id,
-                failed_count=failed_count,
-                pass_rate=_round4(pass_rate),
-                examples=examples[:3],
-            )
+    # Orden por rule_id (claves únicas): no hace falta comparar los valores.
+    rule_details = [
+        QualityRuleDetail(
+            rule_id=rule_id,
+            failed_count=failures.count,
+            pass_rate=_round4(0.0 if total == 0 else (total - failures.count) / total),
+            examples=list(failures.examples),
         )
+        for rule_id, failures in sorted(failures_by_rule.items(), key=itemgetter(0))
+    ]
 
     notes = [
         "pass_rate computed as (total - failed_count)/total per rule_id",
@@ -188,15 +207,8 @@ def write_quality_report(
             "acceptance_rate": _round4(acceptance_rate),
             "rejection_rate": _round4(rejection_rate),
         },
-        "rule_details": [
-            {
-                "rule_id": d.rule_id,
-                "failed_count": d.failed_count,
-                "pass_rate": d.pass_rate,
-                "examples": d.examples,
-            }
-            for d in report.rule_details
-        ],
+        # QualityRuleDetail se serializa directo (dataclass, orden de campos).
+        "rule_details": report.rule_details,
         "failure_rate_by_rule": failure_rate_by_rule,
         "quality_gate": {
             "policy": {
@@ -211,8 +223,8 @@ def write_quality_report(
         "notes": report.notes,
     }
 
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    path.write_bytes(dumps_pretty(payload))
 
 
-def failures_dict() -> dict[str, list[str]]:
-    return defaultdict(list)
+def failures_dict() -> defaultdict[str, BoundedExamples]:
+    return defaultdict(BoundedExamples)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Hashable
+from dataclasses import dataclass, field
 from typing import Protocol
 
 from workflow.models import NormalizedRequest, RuleFailure, Severity
@@ -17,7 +18,13 @@ class Rule(Protocol):
         """Return reason string if fails, otherwise None."""
 
 
-@dataclass(frozen=True)
+class CacheableRule(Rule, Protocol):
+    def cache_key(self, r: NormalizedRequest) -> Hashable:
+        """Return the subset of `r` that `check` reads (same key => same result)."""
+        ...
+
+
+@dataclass(frozen=True, slots=True)
 class RequiredFieldsRule:
     rule_id: str = "REQUIRED_FIELDS"
     severity: Severity = Severity.HIGH
@@ -37,25 +44,37 @@ class RequiredFieldsRule:
         return None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CurrencyAllowedRule:
-    allowed: tuple[str, ...] = ("ARS", "USD", "EUR")
+    # frozenset: membresía O(1) por registro; el mensaje lista los valores ordenados.
+    allowed: frozenset[str] = frozenset(("ARS", "USD", "EUR"))
     rule_id: str = "CURRENCY_ALLOWED"
     severity: Severity = Severity.MEDIUM
+    # Lista para el mensaje de rechazo, formateada una vez al construir la regla.
+    allowed_display: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "allowed_display", str(sorted(self.allowed)))
+
+    def cache_key(self, r: NormalizedRequest) -> Hashable:
+        return r.moneda
 
     def check(self, r: NormalizedRequest) -> str | None:
         if r.moneda not in self.allowed:
-            return f"moneda '{r.moneda}' not in allowed list {list(self.allowed)}"
+            return f"moneda '{r.moneda}' not in allowed list {self.allowed_display}"
         return None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AmountRangeRule:
     min_value: float = 1.0
     max_value: float = 1_000_000.0
     rule_id: str = "AMOUNT_RANGE"
     severity: Severity = Severity.MEDIUM
 
+    # Sin cache_key a propósito: -0.0 == 0.0 (mismo hash) pero el motivo los
+    # formatea distinto; y los montos casi no se repiten entre registros.
+
     def check(self, r: NormalizedRequest) -> str | None:
         if r.monto_o_limite < self.min_value or r.monto_o_limite > self.max_value:
             return f"monto_o_limite {r.monto_o_limite} out of range [{self.min_value}, {self.max_value}]"
@@ -3,19 +3,23 @@ from __future__ import annotations
 
 import argparse
 import hashlib
-import json
+import os
 import platform
 import shlex
 import sys
-import uuid
-from datetime import UTC, datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
+from operator import attrgetter
 from pathlib import Path
 from typing import Any
 
-from workflow.audit import AuditEvent, AuditLogger, StageTimer, utc_now_iso
-from workflow.engine import validate
-from workflow.io import InputFormatError, read_requests, write_clean_csv
-from workflow.normalize import NormalizationError, normalize
+from workflow.audit import AuditLogger, StageTimer, utc_now_iso
+from workflow.engine import RuleCache, iter_process
+from workflow.io import CsvRowWriter, InputFormatError, read_requests, resolve_input_format
+from workflow.jsonfmt import dumps_pretty
+from workflow.models import Decision, NormalizedRequest
+from workflow.normalize import NormalizationError
 from workflow.quality import (
     QualityGatePolicy,
     build_quality_report,
@@ -28,6 +32,22 @@ from workflow.rules import AmountRangeRule, CurrencyAllowedRule, RequiredFieldsR
 PIPELINE_VERSION = "0.2.0"
 MANIFEST_SCHEMA = "ai_factory.workflow.run_manifest.v2"
 
+# Esquema fijo de las salidas CSV (no depende de cuál sea la primera fila).
+NORMALIZED_COLUMNS: tuple[str, ...] = tuple(f.name for f in fields(NormalizedRequest))
+REJECTED_COLUMNS: tuple[str, ...] = (*NORMALIZED_COLUMNS, "reject_rule_ids", "reject_reasons")
+
+# Reglas inmutables (frozen): se instancian una vez por proceso, no por corrida.
+ELIGIBILITY_RULES: tuple[Rule, ...] = (
+    RequiredFieldsRule(),
+    CurrencyAllowedRule(),
+    AmountRangeRule(),
+)
+
+# Fila posicional de salida; csv.writer escribe la fecha vía str(date), que es ISO.
+_normalized_values = attrgetter(*NORMALIZED_COLUMNS)
+# Un error de normalización solo conoce el id: el resto de columnas va vacío.
+_EMPTY_NORMALIZED_TAIL: tuple[str, ...] = ("",) * (len(NORMALIZED_COLUMNS) - 1)
+
 
 class WorkflowError(RuntimeError):
     """Fatal error for the workflow run."""
@@ -49,32 +69,65 @@ def parse_args() -> argparse.Namespace:
         default="auto",
         help="Input format: auto|csv|json|txt|cobol (default: auto)",
     )
+    p.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Normalize+validate each distinct raw record once; duplicates reuse the result",
+    )
     return p.parse_args()
 
 
+class _SafeLabelTable(dict[int, str]):
+    # Tabla para str.translate (código -> carácter resultante). Se completa
+    # bajo demanda, también fuera de ASCII, con el mismo criterio isalnum.
+    def __missing__(self, code: int) -> str:
+        ch = chr(code)
+        value = ch if ch.isalnum() or ch in "-_" else "_"
+        self[code] = value
+        return value
+
+
+_SAFE_LABEL_TABLE = _SafeLabelTable()
+
+
 def _safe_label(s: str) -> str:
     s = s.strip()
     if not s:
         return "run"
-    return "".join(ch if ch.isalnum() or ch in {"-", "_"} else "_" for ch in s)
+    return s.translate(_SAFE_LABEL_TABLE)
+
+
+def _new_run_id() -> str:
+    # UUID4 canónico (8-4-4-4-12) armado desde os.urandom: mismos bits de
+    # versión y variante que uuid.uuid4(), sin importar uuid ni crear el objeto.
+    b = bytearray(os.urandom(16))
+    b[6] = (b[6] & 0x0F) | 0x40
+    b[8] = (b[8] & 0x3F) | 0x80
+    h = b.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
 
 
 def _run_key(run_id: str, label: str) -> str:
-    stamp = datetime.now(UTC).strftime("%Y-%m-%d_%H%M%SZ")
+    # Mismo formato que strftime("%Y-%m-%d_%H%M%SZ") en UTC, sin parsear el formato.
+    t = time.gmtime()
+    stamp = (
+        f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}_"
+        f"{t.tm_hour:02d}{t.tm_min:02d}{t.tm_sec:02d}Z"
+    )
     return f"{stamp}__{_safe_label(label)}__{run_id[:8]}"
 
 
 def _write_json(path: Path, payload: dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    path.write_bytes(dumps_pretty(payload))
 
 
 def _sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
+    # file_digest (3.11+) itera en C con buffer propio, sin buffering de Python;
+    # hashlib usa OpenSSL, que despacha a SHA-NI / ARMv8 SHA2 si el CPU las tiene.
+    # Es el paso que domina el costo de integridad (input + artefactos).
+    with path.open("rb", buffering=0) as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
 
 
 def _sha256_or_none(path: Path) -> str | None:
@@ -90,23 +143,6 @@ def _relpath(p: Path, base: Path) -> str:
         return str(p)
 
 
-def _resolve_format(input_path: Path, requested: str) -> str:
-    fmt = requested.lower().strip()
-    if fmt != "auto":
-        return fmt
-
-    suffix = input_path.suffix.lower()
-    if suffix == ".csv":
-        return "csv"
-    if suffix == ".json":
-        return "json"
-    if suffix == ".txt":
-        return "txt"
-    if suffix in {".dat", ".cob"}:
-        return "cobol"
-    return "unknown"
-
-
 def _command_string(argv: list[str]) -> str:
     # En Windows también sirve como “replay” humano.
     return " ".join(shlex.quote(a) for a in argv)
@@ -115,7 +151,7 @@ def _command_string(argv: list[str]) -> str:
 def main() -> int:
     args = parse_args()
 
-    run_id = str(uuid.uuid4())
+    run_id = _new_run_id()
     run_label = args.run_label.strip() or args.input.stem
     run_key = _run_key(run_id, run_label)
 
@@ -128,24 +164,48 @@ def main() -> int:
     rejected_path = run_dir / "rejected_requests.csv"
     quality_path = run_dir / "data_quality_report.json"
     manifest_path = run_dir / "run_manifest.json"
+    # Estado liviano durante la corrida: el manifest se escribe solo al cerrar
+    # (o al fallar), no se re-serializa completo en cada etapa.
+    status_path = run_dir / "run_status.txt"
+
+    # Rutas relativas al run_dir (manifest, quality gate, logs): una vez por corrida.
+    rel = {
+        name: _relpath(p, run_dir)
+        for name, p in (
+            ("decision_log", decision_log_path),
+            ("normalized_requests", normalized_path),
+            ("rejected_requests", rejected_path),
+            ("data_quality_report", quality_path),
+            ("run_manifest", manifest_path),
+            ("run_status", status_path),
+        )
+    }
+    # El manifest no puede incluir su propio hash y run_status.txt se reescribe
+    # después del manifest: la integridad cubre solo los artefactos de datos.
+    hashed = {k: v for k, v in rel.items() if k not in ("run_manifest", "run_status")}
 
     audit = AuditLogger(decision_log_path)
     t_all = StageTimer()
 
     run_start_utc = utc_now_iso()
-    fmt_resolved = _resolve_format(args.input, args.format)
+    fmt_resolved = resolve_input_format(args.input, args.format)
 
     def log(level: str, stage: str, event: str, message: str, **extra: Any) -> None:
+        # Mismo shape que AuditEvent, sin instanciarlo por evento.
         audit.emit(
-            AuditEvent(
-                ts_utc=utc_now_iso(),
-                level=level,
-                run_id=run_id,
-                stage=stage,
-                event=event,
-                message=message,
-                extra=extra or None,
-            )
+            {
+                "ts_utc": utc_now_iso(),
+                "level": level,
+                "run_id": run_id,
+                "stage": stage,
+                "event": event,
+                "message": message,
+                "elapsed_ms": None,
+                "record_id": None,
+                "rule_id": None,
+                "reason": None,
+                "extra": extra or None,
+            }
         )
 
     # --------------------------
@@ -180,7 +240,8 @@ def main() -> int:
             # Campos explícitos (mejor semántica)
             "format_requested": args.format,
             "format_resolved": fmt_resolved,
-            "sha256": _sha256_or_none(args.input),
+            # Se completa en la ingesta (hash en la misma lectura del parser).
+            "sha256": None,
         },
         "quality_gate": {
             "policy_id": "quality_gate.v1",
@@ -191,20 +252,14 @@ def main() -> int:
             "decision": None,
             "rationale": None,
             "metrics_snapshot": None,
-            "evidence": _relpath(quality_path, run_dir),
-        },
-        "artifacts": {
-            "decision_log": _relpath(decision_log_path, run_dir),
-            "normalized_requests": _relpath(normalized_path, run_dir),
-            "rejected_requests": _relpath(rejected_path, run_dir),
-            "data_quality_report": _relpath(quality_path, run_dir),
-            "run_manifest": _relpath(manifest_path, run_dir),
+            "evidence": rel["data_quality_report"],
         },
+        "artifacts": dict(rel),
         "artifacts_integrity": {},
         "rules": [],
         "counts": None,
     }
-    _write_json(manifest_path, manifest)
+    status_path.write_bytes(b"RUNNING\n")
 
     log(
         "INFO",
@@ -224,37 +279,40 @@ def main() -> int:
     # --------------------------
     t_ingest = StageTimer()
     try:
-        raw_rows = read_requests(args.input, input_format=args.format)
+        # Solo se valida el contrato (header / layout): las filas se leen en
+        # streaming durante el proceso, y el hash se completa en esa lectura.
+        input_digest = hashlib.sha256()
+        raw_rows = read_requests(args.input, input_format=args.format, hash_sink=input_digest)
         log(
             "INFO",
             "ingest",
-            "input_loaded",
-            "Input file loaded",
-            rows=len(raw_rows),
+            "input_opened",
+            "Input contract validated",
             elapsed_ms=t_ingest.elapsed_ms(),
             input_format=fmt_resolved,
         )
+        audit.flush()
     except InputFormatError as exc:
+        manifest["input"]["sha256"] = _sha256_or_none(args.input)
         manifest["run"]["status"] = "FAILED"
         manifest["run"]["end_utc"] = utc_now_iso()
         manifest["run"]["elapsed_ms_total"] = t_all.elapsed_ms()
         manifest["run"]["error"] = str(exc)
         _write_json(manifest_path, manifest)
+        status_path.write_bytes(b"FAILED\n")
         log("ERROR", "ingest", "input_invalid", str(exc), elapsed_ms=t_ingest.elapsed_ms())
+        audit.close()
         return 2
 
     # --------------------------
     # RULES (ELEGIBILIDAD)
     # --------------------------
-    rules: list[Rule] = [RequiredFieldsRule(), CurrencyAllowedRule(), AmountRangeRule()]
+    rules = ELIGIBILITY_RULES
     manifest["rules"] = [
         {"rule_id": r.rule_id, "severity": str(r.severity), "scope": "eligibility"} for r in rules
     ]
-    _write_json(manifest_path, manifest)
 
     failures_by_rule = failures_dict()
-    clean_out: list[dict[str, object]] = []
-    rejected_out: list[dict[str, object]] = []
 
     valid = 0
     invalid = 0
@@ -264,108 +322,113 @@ def main() -> int:
     # --------------------------
     t_process = StageTimer()
 
-    for raw in raw_rows:
-        record_id = raw.id_solicitud.strip()
-
-        try:
-            normalized = normalize(raw)
-        except NormalizationError as exc:
-            invalid += 1
-            failures_by_rule["NORMALIZATION_ERROR"].append(record_id)
-            rejected_out.append(
-                {
-                    "id_solicitud": record_id,
-                    "reject_rule_ids": "NORMALIZATION_ERROR",
-                    "reject_reasons": str(exc),
-                }
-            )
-            log(
-                "WARN",
-                "normalize",
-                "record_rejected",
-                "Normalization failed",
-                record_id=record_id,
-                rule_id="NORMALIZATION_ERROR",
-                reason=str(exc),
-            )
-            continue
-
-        result = validate(normalized, rules)
-
-        if result.decision.value == "ACCEPT":
-            valid += 1
-            clean_out.append(
-                {
-                    "id_solicitud": normalized.id_solicitud,
-                    "fecha_solicitud": normalized.fecha_solicitud.isoformat(),
-                    "tipo_producto": normalized.tipo_producto,
-                    "id_cliente": normalized.id_cliente,
-                    "monto_o_limite": normalized.monto_o_limite,
-                    "moneda": normalized.moneda,
-                    "pais": normalized.pais,
-                    "is_vip": normalized.is_vip,
-                    "risk_score": normalized.risk_score,
-                    "risk_bucket": normalized.risk_bucket,
-                }
-            )
-        else:
-            invalid += 1
-            rule_ids = [f.rule_id for f in result.failures]
-            reasons = [f.reason for f in result.failures]
-            for f in result.failures:
-                failures_by_rule[f.rule_id].append(record_id)
-
-            rejected_out.append(
-                {
-                    "id_solicitud": normalized.id_solicitud,
-                    "fecha_solicitud": normalized.fecha_solicitud.isoformat(),
-                    "tipo_producto": normalized.tipo_producto,
-                    "id_cliente": normalized.id_cliente,
-                    "monto_o_limite": normalized.monto_o_limite,
-                    "moneda": normalized.moneda,
-                    "pais": normalized.pais,
-                    "is_vip": normalized.is_vip,
-                    "risk_score": normalized.risk_score,
-                    "risk_bucket": normalized.risk_bucket,
-                    "reject_rule_ids": "|".join(rule_ids),
-                    "reject_reasons": " | ".join(reasons),
-                }
-            )
-
-            log(
-                "WARN",
-                "validate",
-                "record_rejected",
-                "Eligibility rule failed",
-                record_id=record_id,
-                rule_ids=rule_ids,
-            )
+    rule_cache = RuleCache()
+    # Streaming: cada registro se escribe apenas se clasifica. Con --dedup los
+    # duplicados reusan el resultado del primer registro igual.
+    processed = iter_process(raw_rows, rules, rule_cache, dedup=args.dedup)
+
+    # Salidas en streaming: sin acumular aceptados / rechazados en memoria.
+    with (
+        CsvRowWriter(normalized_path, NORMALIZED_COLUMNS) as clean_writer,
+        CsvRowWriter(rejected_path, REJECTED_COLUMNS) as rejected_writer,
+    ):
+        # Alias locales para el loop por registro: evitan LOAD_ATTR / LOAD_GLOBAL
+        # por fila (failures_by_rule y log ya son locales de main).
+        write_clean = clean_writer.writerow
+        write_rejected = rejected_writer.writerow
+        normalized_values = _normalized_values
+        empty_tail = _EMPTY_NORMALIZED_TAIL
+        accept = Decision.ACCEPT
+
+        for item in processed:
+            if isinstance(item, NormalizationError):
+                record_id = item.record_id
+                reason = str(item)
+                invalid += 1
+                failures_by_rule["NORMALIZATION_ERROR"].append(record_id)
+                write_rejected((record_id, *empty_tail, "NORMALIZATION_ERROR", reason))
+                log(
+                    "WARN",
+                    "normalize",
+                    "record_rejected",
+                    "Normalization failed",
+                    record_id=record_id,
+                    rule_id="NORMALIZATION_ERROR",
+                    reason=reason,
+                )
+                continue
 
+            normalized, result = item
+            # normalize() ya dejó el id sin espacios: no lo recalculamos por registro.
+            record_id = normalized.id_solicitud
+
+            if result.decision is accept:
+                valid += 1
+                write_clean(normalized_values(normalized))
+            else:
+                invalid += 1
+                # Un único recorrido de las fallas: ids, motivos y conteo por regla.
+                rule_ids: list[str] = []
+                reasons: list[str] = []
+                for f in result.failures:
+                    rule_ids.append(f.rule_id)
+                    reasons.append(f.reason)
+                    failures_by_rule[f.rule_id].append(record_id)
+
+                write_rejected(
+                    (*normalized_values(normalized), "|".join(rule_ids), " | ".join(reasons))
+                )
+
+                log(
+                    "WARN",
+                    "validate",
+                    "record_rejected",
+                    "Eligibility rule failed",
+                    record_id=record_id,
+                    rule_ids=rule_ids,
+                )
+
+    # La entrada ya se consumió completa: hash final; cada registro quedó
+    # contado como válido o inválido.
+    manifest["input"]["sha256"] = input_digest.hexdigest()
+    total = valid + invalid
+    log(
+        "INFO",
+        "ingest",
+        "input_loaded",
+        "Input file loaded",
+        rows=total,
+        elapsed_ms=t_ingest.elapsed_ms(),
+        input_format=fmt_resolved,
+    )
     log(
         "INFO",
         "process",
         "processing_completed",
         "Processing completed",
-        total=len(raw_rows),
+        total=total,
         valid=valid,
         invalid=invalid,
         elapsed_ms=t_process.elapsed_ms(),
+        dedup=args.dedup,
+        rule_cache_hits=rule_cache.hits,
+        rule_cache_misses=rule_cache.misses,
+        rule_cache_hit_rate=round(rule_cache.hit_rate, 4),
     )
+    audit.flush()
 
     # --------------------------
     # OUTPUTS + QUALITY REPORT
     # --------------------------
+    # Los CSV ya se escribieron durante el proceso; acá queda el reporte.
     t_out = StageTimer()
 
-    write_clean_csv(normalized_path, clean_out)
-    write_clean_csv(rejected_path, rejected_out)
-
     quality_report = build_quality_report(
         run_id=run_id,
-        total=len(raw_rows),
+        total=total,
         valid=valid,
         invalid=invalid,
-        failures_by_rule=dict(failures_by_rule),
+        failures_by_rule=failures_by_rule,
     )
     write_quality_report(quality_path, quality_report)
 
@@ -375,16 +438,17 @@ def main() -> int:
         "artifacts_written",
         "Artifacts generated",
         elapsed_ms=t_out.elapsed_ms(),
-        normalized_requests=_relpath(normalized_path, run_dir),
-        rejected_requests=_relpath(rejected_path, run_dir),
-        data_quality_report=_relpath(quality_path, run_dir),
-        decision_log=_relpath(decision_log_path, run_dir),
+        normalized_requests=rel["normalized_requests"],
+        rejected_requests=rel["rejected_requests"],
+        data_quality_report=rel["data_quality_report"],
+        decision_log=rel["decision_log"],
     )
+    audit.flush()
 
     # --------------------------
     # GOVERNANCE: QUALITY GATE (POLÍTICA + DECISIÓN + EVIDENCIA)
     # --------------------------
-    total_records = len(raw_rows)
+    total_records = total
     acceptance_rate = 0.0 if total_records <= 0 else valid / total_records
     rejection_rate = 0.0 if total_records <= 0 else invalid / total_records
 
@@ -409,7 +473,7 @@ def main() -> int:
         "decision": gate.decision,
         "rationale": gate.rationale,
         "metrics_snapshot": gate.metrics_snapshot,
-        "evidence": _relpath(quality_path, run_dir),
+        "evidence": rel["data_quality_report"],
     }
 
     log(
@@ -427,14 +491,14 @@ def main() -> int:
     # --------------------------
     # INTEGRIDAD DE ARTEFACTOS (CHAIN-OF-CUSTODY)
     # --------------------------
+    # El hash del decision log debe reflejar todo lo emitido hasta acá.
+    audit.flush()
     integrity: dict[str, dict[str, str | None]] = {}
-    artifacts_obj = manifest.get("artifacts", {})
-    if isinstance(artifacts_obj, dict):
-        for name, rel in artifacts_obj.items():
-            if not isinstance(rel, str):
-                continue
-            p = run_dir / rel
-            integrity[str(name)] = {"path": rel, "sha256": _sha256_or_none(p)}
+    # hashlib libera el GIL al hashear: los artefactos se procesan en paralelo.
+    with ThreadPoolExecutor(max_workers=min(len(hashed), os.cpu_count() or 1)) as ex:
+        digests = ex.map(_sha256_or_none, [run_dir / p for p in hashed.values()])
+        for (name, rel_path), digest in zip(hashed.items(), digests, strict=True):
+            integrity[name] = {"path": rel_path, "sha256": digest}
 
     manifest["artifacts_integrity"] = integrity
 
@@ -445,6 +509,7 @@ def main() -> int:
     manifest["run"]["end_utc"] = utc_now_iso()
     manifest["run"]["elapsed_ms_total"] = t_all.elapsed_ms()
     _write_json(manifest_path, manifest)
+    status_path.write_bytes(f"{manifest['run']['status']}\n".encode())
 
     log(
         "INFO",
@@ -454,6 +519,7 @@ def main() -> int:
         status=manifest["run"]["status"],
         elapsed_ms_total=manifest["run"]["elapsed_ms_total"],
     )
+    audit.close()
 
     print(f"run_id={run_id}")
     print(f"run_key={run_key}")
@@ -1,9 +1,23 @@
 from __future__ import annotations
 
+import csv
+import hashlib
 import json
+from dataclasses import fields
 from pathlib import Path
 
-from workflow.io import read_requests
+import pytest
+
+from workflow.io import (
+    DEFAULT_COBOL_LAYOUT,
+    REQUIRED_COLUMNS,
+    CsvRowWriter,
+    InputFormatError,
+    read_cobol_fixed_width,
+    read_requests,
+    resolve_input_format,
+)
+from workflow.models import RawRequest
 
 
 def _fw(value: str, width: int) -> str:
@@ -37,6 +51,11 @@ def _build_cobol_line(
     )
 
 
+def test_required_columns_follow_raw_request_field_order() -> None:
+    # Los readers arman RawRequest posicionalmente a partir de REQUIRED_COLUMNS.
+    assert tuple(f.name for f in fields(RawRequest)) == REQUIRED_COLUMNS
+
+
 def test_read_json_format(tmp_path: Path) -> None:
     p = tmp_path / "input.json"
     payload = [
@@ -54,7 +73,7 @@ def test_read_json_format(tmp_path: Path) -> None:
     ]
     p.write_text(json.dumps(payload), encoding="utf-8")
 
-    rows = read_requests(p, input_format="json")
+    rows = list(read_requests(p, input_format="json"))
     assert len(rows) == 1
     assert rows[0].id_solicitud == "REQ-1"
 
@@ -70,7 +89,7 @@ def test_read_txt_delimited_format(tmp_path: Path) -> None:
         encoding="utf-8",
     )
 
-    rows = read_requests(p, input_format="txt")
+    rows = list(read_requests(p, input_format="txt"))
     assert len(rows) == 1
     assert rows[0].id_cliente == "CLI-2"
 
@@ -90,6 +109,104 @@ def test_read_cobol_fixed_width_format(tmp_path: Path) -> None:
     )
     p.write_text(line + "\n", encoding="utf-8")
 
-    rows = read_requests(p, input_format="cobol")
+    rows = list(read_requests(p, input_format="cobol"))
     assert len(rows) == 1
     assert rows[0].moneda == "EUR"
+
+
+def test_read_cobol_fixed_width_checks_layout_on_call(tmp_path: Path) -> None:
+    p = tmp_path / "input.cob"
+    p.write_text("\n" + "X" * 71 + "\n", encoding="utf-8")
+    # Sin iterar: el layout se valida al llamar, contra la primera línea con datos.
+    with pytest.raises(InputFormatError, match="layout mismatch at line 2"):
+        read_cobol_fixed_width(p, layout=DEFAULT_COBOL_LAYOUT[1:])
+
+    p.write_text("\n  \n", encoding="utf-8")
+    with pytest.raises(InputFormatError, match="no data rows"):
+        read_requests(p, input_format="cobol")
+
+
+def test_read_csv_reordered_columns_and_short_row(tmp_path: Path) -> None:
+    p = tmp_path / "input.csv"
+    p.write_text(
+        (
+            "moneda,id_solicitud,fecha_solicitud,tipo_producto,id_cliente,monto_o_limite,"
+            "pais,is_vip,risk_score\n"
+            "ARS,REQ-4,2026-02-10,cuenta,CLI-4,100,AR,true,10\n"
+            "\n"
+            "USD,REQ-5,2026-02-10,cuenta,CLI-5,100,AR\n"
+        ),
+        encoding="utf-8",
+    )
+
+    rows = list(read_requests(p, input_format="csv"))
+    assert len(rows) == 2
+    assert rows[0].moneda == "ARS"
+    assert rows[0].id_solicitud == "REQ-4"
+    assert rows[1].is_vip == ""
+    assert rows[1].risk_score == ""
+
+
+def test_read_csv_duplicate_header_uses_last_column(tmp_path: Path) -> None:
+    p = tmp_path / "input.csv"
+    p.write_text(
+        (
+            "moneda,id_solicitud,fecha_solicitud,tipo_producto,id_cliente,monto_o_limite,"
+            "pais,is_vip,risk_score,moneda\n"
+            "BRL,REQ-6,2026-02-10,cuenta,CLI-6,100,AR,true,10,ARS\n"
+        ),
+        encoding="utf-8",
+    )
+
+    rows = list(read_requests(p, input_format="csv"))
+    with p.open(encoding="utf-8", newline="") as f:
+        expected = next(csv.DictReader(f))
+    assert rows[0].moneda == expected["moneda"] == "ARS"
+
+
+def test_read_requests_streams_but_checks_header_eagerly(tmp_path: Path) -> None:
+    p = tmp_path / "input.csv"
+    p.write_text("id_solicitud,moneda\nREQ-6,ARS\n", encoding="utf-8")
+
+    # El contrato falla al llamar, sin necesidad de consumir el iterador.
+    with pytest.raises(InputFormatError):
+        read_requests(p, input_format="csv")
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["sample_requests.csv", "sample_requests.json", "sample_requests.txt", "sample_requests.cob"],
+)
+def test_read_requests_hash_sink_matches_file_digest(name: str) -> None:
+    path = Path(__file__).resolve().parents[1] / "data" / name
+    sink = hashlib.sha256()
+    rows = list(read_requests(path, hash_sink=sink))
+    assert rows
+    assert sink.hexdigest() == hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@pytest.mark.parametrize(
+    ("name", "requested", "expected"),
+    [
+        ("in.CSV", "auto", "csv"),
+        ("in.cob", "auto", "cobol"),
+        ("in.xml", "auto", "unknown"),
+        ("in.txt", "fixed-width", "cobol"),
+        ("in.txt", " JSON ", "json"),
+    ],
+)
+def test_resolve_input_format(name: str, requested: str, expected: str) -> None:
+    assert resolve_input_format(Path(name), requested) == expected
+
+
+def test_csv_row_writer_streams_rows_and_leaves_empty_file_without_rows(tmp_path: Path) -> None:
+    out = tmp_path / "out.csv"
+    with CsvRowWriter(out, ["id", "monto"]) as writer:
+        writer.writerow(("A", 1.5))
+        writer.writerow(("B", 2.0))
+    assert out.read_text(encoding="utf-8").splitlines() == ["id,monto", "A,1.5", "B,2.0"]
+
+    empty = tmp_path / "empty.csv"
+    with CsvRowWriter(empty, ["id", "monto"]):
+        pass
+    assert empty.read_text(encoding="utf-8") == ""
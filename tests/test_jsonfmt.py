@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import pytest
+
+from workflow.audit import AuditEvent
+from workflow.jsonfmt import dumps_line, dumps_pretty, stdlib_dumps_line, stdlib_dumps_pretty
+from workflow.models import Decision, RuleFailure, Severity, ValidationResult
+
+
+def test_stdlib_fallback_matches_fast_path() -> None:
+    pytest.importorskip("orjson")
+    ev = AuditEvent(
+        ts_utc="2026-02-10T00:00:00+00:00",
+        level="WARN",
+        run_id="r-1",
+        stage="validate",
+        event="record_rejected",
+        message="Regla de moneda: 'BRL' ñ",
+        extra={"rule_ids": ["CURRENCY_ALLOWED"], "rate": 0.25, "n": 3, "ok": None},
+    )
+    payload = {"totals": {"total": 4, "acceptance_rate": 0.75}, "notes": [], "empty": {}}
+
+    assert dumps_line(ev) == stdlib_dumps_line(ev)
+    assert dumps_pretty(payload) == stdlib_dumps_pretty(payload)
+
+
+def test_stdlib_fallback_serializes_nested_dataclasses() -> None:
+    vr = ValidationResult(
+        decision=Decision.REJECT,
+        failures=(RuleFailure(rule_id="AMOUNT_RANGE", severity=Severity.MEDIUM, reason="x"),),
+    )
+    assert stdlib_dumps_line(vr) == (
+        b'{"decision":"REJECT","failures":[{"rule_id":"AMOUNT_RANGE","severity":"MEDIUM","reason":"x"}]}\n'
+    )
@@ -3,7 +3,7 @@ from __future__ import annotations
 import pytest
 
 from workflow.models import RawRequest
-from workflow.normalize import NormalizationError, normalize
+from workflow.normalize import NormalizationError, normalize, normalize_batch
 
 
 def test_normalize_ok() -> None:
@@ -39,3 +39,112 @@ def test_normalize_bad_date() -> None:
     )
     with pytest.raises(NormalizationError):
         normalize(raw)
+
+
+@pytest.mark.parametrize("fecha", ["20260210", "2026-W06-2", "2026-02-30"])
+def test_normalize_rejects_non_canonical_iso_dates(fecha: str) -> None:
+    raw = RawRequest(
+        id_solicitud="REQ-5",
+        fecha_solicitud=fecha,
+        tipo_producto="cuenta",
+        id_cliente="CLI-5",
+        monto_o_limite="1000",
+        moneda="ARS",
+        pais="AR",
+        is_vip="false",
+        risk_score="10",
+    )
+    with pytest.raises(NormalizationError):
+        normalize(raw)
+
+
+def test_normalize_batch_keeps_order_and_isolates_errors() -> None:
+    ok = RawRequest(
+        id_solicitud="REQ-3",
+        fecha_solicitud="2026-02-10",
+        tipo_producto="cuenta",
+        id_cliente="CLI-3",
+        monto_o_limite="1000",
+        moneda="ARS",
+        pais="AR",
+        is_vip="false",
+        risk_score="70",
+    )
+    bad = RawRequest(
+        id_solicitud="REQ-4",
+        fecha_solicitud="2026-02-10",
+        tipo_producto="cuenta",
+        id_cliente="CLI-4",
+        monto_o_limite="abc",
+        moneda="ARS",
+        pais="AR",
+        is_vip="false",
+        risk_score="10",
+    )
+    out = normalize_batch([ok, bad, ok])
+    assert len(out) == 3
+    assert out[0] == normalize(ok)
+    assert isinstance(out[1], NormalizationError)
+    assert out[1].record_id == "REQ-4"
+    assert out[2] == out[0]
+
+
+@pytest.mark.parametrize(
+    ("score", "bucket"),
+    [
+        ("-1", "LOW"),
+        ("0", "LOW"),
+        ("33", "LOW"),
+        ("34", "MED"),
+        ("66", "MED"),
+        ("67", "HIGH"),
+        ("99", "HIGH"),
+        ("150", "HIGH"),
+    ],
+)
+def test_normalize_risk_bucket_edges(score: str, bucket: str) -> None:
+    raw = RawRequest(
+        id_solicitud="REQ-6",
+        fecha_solicitud="2026-02-10",
+        tipo_producto="cuenta",
+        id_cliente="CLI-6",
+        monto_o_limite="1000",
+        moneda="ARS",
+        pais="AR",
+        is_vip="false",
+        risk_score=score,
+    )
+    nr = normalize(raw)
+    assert nr.risk_score == int(score)
+    assert nr.risk_bucket == bucket
+
+
+@pytest.mark.parametrize(
+    ("field", "value", "message"),
+    [
+        ("monto_o_limite", "  ", "monto_o_limite is empty"),
+        ("monto_o_limite", "1,5", "monto_o_limite is not numeric: '1,5'"),
+        ("risk_score", "", "risk_score is empty"),
+        ("risk_score", " 4.5 ", "risk_score is not an int: ' 4.5 '"),
+        ("is_vip", "si", "is_vip is not a boolean: 'si'"),
+    ],
+)
+def test_normalize_field_errors(field: str, value: str, message: str) -> None:
+    fields = {
+        "id_solicitud": "REQ-7",
+        "fecha_solicitud": "2026-02-10",
+        "tipo_producto": "cuenta",
+        "id_cliente": "CLI-7",
+        "monto_o_limite": " 1000.5 ",
+        "moneda": "ARS",
+        "pais": "AR",
+        "is_vip": " YES ",
+        "risk_score": " 40 ",
+    }
+    nr = normalize(RawRequest(**fields))
+    assert (nr.monto_o_limite, nr.is_vip, nr.risk_score) == (1000.5, True, 40)
+
+    fields[field] = value
+    with pytest.raises(NormalizationError) as exc_info:
+        normalize(RawRequest(**fields))
+    assert str(exc_info.value) == message
@@ -0,0 +1,17 @@
+from workflow.quality import MAX_RULE_EXAMPLES, build_quality_report, failures_dict
+
+
+def test_failures_dict_counts_all_but_keeps_bounded_examples() -> None:
+    failures = failures_dict()
+    for i in range(10):
+        failures["CURRENCY_ALLOWED"].append(f"REQ-{i}")
+    failures["AMOUNT_RANGE"].append("REQ-99")
+
+    report = build_quality_report("run-1", total=20, valid=9, invalid=11, failures_by_rule=failures)
+
+    by_rule = {d.rule_id: d for d in report.rule_details}
+    assert [d.rule_id for d in report.rule_details] == ["AMOUNT_RANGE", "CURRENCY_ALLOWED"]
+    assert by_rule["CURRENCY_ALLOWED"].failed_count == 10
+    assert by_rule["CURRENCY_ALLOWED"].examples == [f"REQ-{i}" for i in range(MAX_RULE_EXAMPLES)]
+    assert by_rule["CURRENCY_ALLOWED"].pass_rate == 0.5
+    assert by_rule["AMOUNT_RANGE"].examples == ["REQ-99"]
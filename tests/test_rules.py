@@ -1,7 +1,14 @@
 from datetime import date
 
-from workflow.engine import validate
-from workflow.models import NormalizedRequest
+from workflow.engine import (
+    Processed,
+    RuleCache,
+    compile_validator,
+    iter_process,
+    validate,
+)
+from workflow.models import NormalizedRequest, RawRequest
+from workflow.normalize import NormalizationError
 from workflow.rules import AmountRangeRule, CurrencyAllowedRule, RequiredFieldsRule, Rule
 
 
@@ -31,3 +38,93 @@ def test_validate_reject_currency() -> None:
     vr = validate(_nr("BRL", 1000), rules)
     assert vr.decision.value == "REJECT"
     assert any(f.rule_id == "CURRENCY_ALLOWED" for f in vr.failures)
+
+
+def test_rule_cache_reuses_results_and_is_bounded() -> None:
+    rules: list[Rule] = [RequiredFieldsRule(), CurrencyAllowedRule()]
+    cache = RuleCache(maxsize=1)
+    for moneda in ("BRL", "BRL", "ARS", "BRL"):
+        assert validate(_nr(moneda, 1000), rules, cache) == validate(_nr(moneda, 1000), rules)
+    # REQUIRED_FIELDS no declara cache_key; maxsize=1 desaloja BRL al ver ARS.
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    # AMOUNT_RANGE no se cachea: 0.0 y -0.0 son iguales pero el motivo difiere.
+    amount_rules: list[Rule] = [AmountRangeRule()]
+    cache = RuleCache()
+    for monto in (0.0, -0.0, 0.0):
+        assert validate(_nr("ARS", monto), amount_rules, cache) == validate(
+            _nr("ARS", monto), amount_rules
+        )
+    reason = validate(_nr("ARS", -0.0), amount_rules, cache).failures[0].reason
+    assert reason.startswith("monto_o_limite -0.0 ")
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_rule_cache_separates_rules_with_same_id() -> None:
+    # Mismo rule_id, distintos parámetros: cada regla tiene sus propias entradas.
+    rule_sets: list[list[Rule]] = [
+        [AmountRangeRule(), AmountRangeRule(max_value=10.0)],
+        [CurrencyAllowedRule(), CurrencyAllowedRule(allowed=frozenset(("USD",)))],
+    ]
+    for rules in rule_sets:
+        r = _nr("ARS", 50.0)
+        expected = validate(r, rules)
+        assert expected.decision.value == "REJECT"
+        assert validate(r, rules, RuleCache()) == expected
+
+
+def test_compile_validator_matches_validate() -> None:
+    records = [
+        _nr("ARS", 1000),
+        _nr("BRL", 0),
+        _nr("USD", 5_000_000),
+        _nr("", 10, id_cliente=""),
+        # NaN no pasa el predicado en línea pero AMOUNT_RANGE no lo rechaza.
+        _nr("ARS", float("nan")),
+        _nr("BRL", float("nan")),
+    ]
+    rule_sets: list[list[Rule]] = [
+        [RequiredFieldsRule(), CurrencyAllowedRule(), AmountRangeRule()],
+        [AmountRangeRule(min_value=100.0), CurrencyAllowedRule(allowed=frozenset(("USD",)))],
+        # Tipos repetidos: camino genérico.
+        [AmountRangeRule(), AmountRangeRule(max_value=10.0)],
+    ]
+    for rules in rule_sets:
+        validator = compile_validator(rules)
+        assert [validator(r) for r in records] == [validate(r, rules) for r in records]
+
+    # En un rechazo solo se consulta (y cachea) la regla que falló.
+    cache = RuleCache()
+    cached_rules: list[Rule] = [RequiredFieldsRule(), CurrencyAllowedRule(), AmountRangeRule()]
+    validator = compile_validator(cached_rules, cache)
+    assert validator(_nr("ARS", 1000)).decision.value == "ACCEPT"
+    assert [f.rule_id for f in validator(_nr("BRL", 1000)).failures] == ["CURRENCY_ALLOWED"]
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_currency_reason_lists_allowed_sorted() -> None:
+    assert CurrencyAllowedRule().check(_nr("BRL", 10)) == (
+        "moneda 'BRL' not in allowed list ['ARS', 'EUR', 'USD']"
+    )
+
+
+def test_iter_process_dedup_matches_plain() -> None:
+    def raw(i: int, fecha: str = "2026-02-10", moneda: str = "ARS") -> RawRequest:
+        return RawRequest(f"REQ-{i}", fecha, "cuenta", "CLI-1", "1000", moneda, "AR", "false", "10")
+
+    raws = [raw(1), raw(2, fecha="10/02/2026x"), raw(3, moneda="BRL"), raw(4)]
+    rules: list[Rule] = [RequiredFieldsRule(), CurrencyAllowedRule(), AmountRangeRule()]
+
+    def view(items: list[Processed]) -> list[object]:
+        # Las excepciones no se comparan por valor: usamos su mensaje.
+        return [str(x) if isinstance(x, NormalizationError) else x for x in items]
+
+    # dedup: duplicados (incluso con error de normalización) reusan el resultado.
+    dup_raws = [*raws, raws[0], raws[1], raws[2]]
+    cache = RuleCache()
+    deduped = list(iter_process(dup_raws, rules, cache, dedup=True))
+    assert view(deduped) == view(list(iter_process(dup_raws, rules)))
+    assert isinstance(deduped[1], NormalizationError)
+    assert deduped[4] is deduped[0]
+    assert deduped[5] is deduped[1]
+    assert cache.misses > 0
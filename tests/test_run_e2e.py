@@ -1,8 +1,10 @@
 # tests/test_run_e2e.py
 from __future__ import annotations
 
+import csv
 import json
 import sys
+import uuid
 from pathlib import Path
 
 from _pytest.monkeypatch import MonkeyPatch
@@ -67,7 +69,54 @@ def test_run_e2e_json_input_generates_artifacts(tmp_path: Path, monkeypatch: Mon
     manifest = json.loads((run_dir / "run_manifest.json").read_text(encoding="utf-8"))
     quality = json.loads((run_dir / "data_quality_report.json").read_text(encoding="utf-8"))
 
+    run_id = manifest["run"]["run_id"]
+    assert str(uuid.UUID(run_id)) == run_id
+    assert uuid.UUID(run_id).version == 4
+    assert run_dir.name.endswith(run_id[:8])
     assert manifest["input"]["format"] == "json"
+    # Integridad: solo artefactos de datos, todos con hash (no el manifest/estado).
+    assert set(manifest["artifacts_integrity"]) == {
+        "decision_log",
+        "normalized_requests",
+        "rejected_requests",
+        "data_quality_report",
+    }
+    assert all(v["sha256"] for v in manifest["artifacts_integrity"].values())
+    assert manifest["artifacts"]["run_status"] == "run_status.txt"
+    status = (run_dir / "run_status.txt").read_text(encoding="utf-8")
+    assert status.strip() == manifest["run"]["status"]
     assert manifest["counts"]["total"] == 2
     assert "quality_gate" in manifest
     assert "totals" in quality
+
+
+def test_run_e2e_rejected_csv_has_fixed_schema(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    input_path = tmp_path / "requests.csv"
+    out_dir = tmp_path / "artifacts"
+    input_path.write_text(
+        (
+            "id_solicitud,fecha_solicitud,tipo_producto,id_cliente,monto_o_limite,"
+            "moneda,pais,is_vip,risk_score\n"
+            # Primero un error de normalización, después un rechazo por regla.
+            "REQ-1,2026/02/10,cuenta,CLI-1,1000,ARS,AR,false,10\n"
+            "REQ-2,2026-02-10,cuenta,CLI-2,1000,BRL,AR,false,10\n"
+            "REQ-3,2026-02-10,cuenta,CLI-3,1000,ARS,AR,false,10\n"
+        ),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(
+        sys, "argv", ["workflow.run", "--input", str(input_path), "--out", str(out_dir)]
+    )
+
+    assert main() == 0
+
+    run_dir = next((out_dir / "runs").iterdir())
+    with (run_dir / "rejected_requests.csv").open(encoding="utf-8", newline="") as f:
+        rejected = list(csv.DictReader(f))
+    with (run_dir / "normalized_requests.csv").open(encoding="utf-8", newline="") as f:
+        accepted = list(csv.DictReader(f))
+
+    assert [r["reject_rule_ids"] for r in rejected] == ["NORMALIZATION_ERROR", "CURRENCY_ALLOWED"]
+    assert rejected[0]["moneda"] == ""
+    assert [r["id_solicitud"] for r in accepted] == ["REQ-3"]
+    assert accepted[0]["fecha_solicitud"] == "2026-02-10"